@@ -1,7 +1,9 @@
 """Classes related adapter connection tests."""
 
+import gaphor.diagram.connectors
 from gaphor import UML
 from gaphor.core.modeling import Diagram
+from gaphor.diagram.connectors import Connector
 from gaphor.diagram.tests.fixtures import allow, connect, disconnect, get_connected
 from gaphor.UML.classes.dependency import DependencyItem
 from gaphor.UML.classes.interface import InterfaceItem
@@ -87,6 +89,54 @@ def test_dependency_reconnect_should_keep_attributes(create):
     assert dep.subject.name == "Name"
 
 
+def test_dependency_reconnect_to_other_element_copies_attributes(create):
+    a1 = create(ActorItem, UML.Actor)
+    a2 = create(ActorItem, UML.Actor)
+    a3 = create(ActorItem, UML.Actor)
+    dep = create(DependencyItem)
+    connect(dep, dep.head, a1)
+    connect(dep, dep.tail, a2)
+    d = dep.subject
+    d.name = "Name"
+    d.visibility = "private"
+
+    connect(dep, dep.tail, a3)
+
+    assert dep.subject is not d
+    assert dep.subject.name == "Name"
+    assert dep.subject.visibility == "private"
+
+
+def test_dependency_connector_copies_subject_on_request(create):
+    a1 = create(ActorItem, UML.Actor)
+    a2 = create(ActorItem, UML.Actor)
+    a3 = create(ActorItem, UML.Actor)
+    dep = create(DependencyItem)
+    connect(dep, dep.head, a1)
+    connect(dep, dep.tail, a2)
+    dep.subject.name = "Name"
+
+    adapter = Connector(a3, dep)
+    adapter.copy_subject()
+    disconnect(dep, dep.tail)
+
+    assert adapter.new_relation_from_copy(UML.Dependency).name == "Name"
+
+
+def test_dependency_allow_does_not_copy_subject(create, monkeypatch):
+    a1 = create(ActorItem, UML.Actor)
+    a2 = create(ActorItem, UML.Actor)
+    a3 = create(ActorItem, UML.Actor)
+    dep = create(DependencyItem)
+    connect(dep, dep.head, a1)
+    connect(dep, dep.tail, a2)
+    copied = []
+    monkeypatch.setattr(gaphor.diagram.connectors, "copy", copied.append)
+
+    assert allow(dep, dep.tail, a3)
+    assert not copied
+
+
 def test_dependency_disconnect(create, element_factory, sanitizer_service):
     actor1 = create(ActorItem, UML.Actor)
     actor2 = create(ActorItem, UML.Actor)
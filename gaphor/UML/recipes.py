@@ -11,6 +11,7 @@ from __future__ import annotations
 import itertools
 from typing import Iterable, Sequence, TypeVar
 
+from gaphor.core.modeling import ElementFactory
 from gaphor.UML.uml import (
     Artifact,
     Association,
@@ -419,3 +420,9 @@ def swap_element(element, new_class):
     """
     if element.__class__ is not new_class:
         element.__class__ = new_class
+        try:
+            model = element.model
+        except TypeError:
+            return
+        if isinstance(model, ElementFactory):
+            model.reindex(element)
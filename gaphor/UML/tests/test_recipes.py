@@ -297,3 +297,28 @@ def test_interaction_messages_cloning(element_factory):
 
     assert m2.sendEvent.covered is rl
     assert m2.receiveEvent.covered is sl
+
+
+def test_swap_element(element_factory):
+    dependency = element_factory.create(UML.Dependency)
+
+    UML.recipes.swap_element(dependency, UML.Usage)
+
+    assert isinstance(dependency, UML.Usage)
+
+
+def test_swap_element_without_model():
+    dependency = UML.Dependency()
+
+    UML.recipes.swap_element(dependency, UML.Usage)
+
+    assert isinstance(dependency, UML.Usage)
+
+
+def test_swap_unlinked_element(element_factory):
+    dependency = element_factory.create(UML.Dependency)
+    dependency.unlink()
+
+    UML.recipes.swap_element(dependency, UML.Usage)
+
+    assert isinstance(dependency, UML.Usage)
@@ -68,6 +68,8 @@ class ElementFactory(Service):
         self.event_manager: EventHandler | None = event_manager
         self.element_dispatcher = element_dispatcher
         self._elements: dict[Id, Element] = OrderedDict()
+        self._elements_by_type: dict[type[Element], dict[Id, Element]] = {}
+        self._indexed_types: dict[Id, type[Element]] = {}
         if event_manager:
             event_manager.subscribe(self._on_unlink_event)
 
@@ -111,10 +113,39 @@ class ElementFactory(Service):
         with self.block_events(event_recorder):
             element = type(id=id, **type_args)  # type: ignore[arg-type]
         self._elements[id] = element
+        self._add_to_index(element)
         self.handle(ElementCreated(self, element, diagram))
         event_recorder.replay()
         return element
 
+    def reindex(self, element: Element) -> None:
+        """Update the type index after the class of ``element`` has changed.
+
+        See :func:`gaphor.UML.recipes.swap_element`.
+        """
+        indexed_type = self._indexed_types.get(element.id)
+        new_type = element.__class__
+        if indexed_type is None or indexed_type is new_type:
+            return
+        self._remove_from_index(element.id)
+        self._indexed_types[element.id] = new_type
+        # Rebuild the bucket, so select() keeps returning elements in creation order
+        indexed_types = self._indexed_types
+        self._elements_by_type[new_type] = {
+            id: e for id, e in self._elements.items() if indexed_types[id] is new_type
+        }
+
+    def _add_to_index(self, element: Element) -> None:
+        self._elements_by_type.setdefault(element.__class__, {})[element.id] = element
+        self._indexed_types[element.id] = element.__class__
+
+    def _remove_from_index(self, id: Id) -> None:
+        indexed_type = self._indexed_types.pop(id)
+        by_type = self._elements_by_type[indexed_type]
+        del by_type[id]
+        if not by_type:
+            del self._elements_by_type[indexed_type]
+
     def size(self) -> int:
         """Return the amount of elements currently in the factory."""
         return len(self._elements)
@@ -150,7 +181,18 @@ class ElementFactory(Service):
         if expression is None:
             yield from self._elements.values()
         elif isinstance(expression, type):
-            yield from (e for e in self._elements.values() if isinstance(e, expression))
+            by_type = [
+                elements
+                for t, elements in self._elements_by_type.items()
+                if issubclass(t, expression)
+            ]
+            if len(by_type) == 1:
+                yield from by_type[0].values()
+            elif by_type:
+                # Keep creation order across types
+                yield from (
+                    e for e in self._elements.values() if isinstance(e, expression)
+                )
         else:
             yield from (e for e in self._elements.values() if expression(e))
 
@@ -230,6 +272,7 @@ class ElementFactory(Service):
             del self._elements[element.id]
         except KeyError:
             return
+        self._remove_from_index(element.id)
         if self.event_manager:
             self.event_manager.handle(
                 ElementDeleted(self, event.element, event.diagram)
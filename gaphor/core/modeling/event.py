@@ -9,6 +9,8 @@ class RevertibleEvent:
     be revertible/undoable.
     """
 
+    __slots__ = ("element",)
+
     def __init__(self, element):
         self.element = element
 
@@ -4,6 +4,7 @@ from collections.abc import Container, Iterable
 import pytest
 
 from gaphor.core import event_handler
+from gaphor.core.modeling import Element
 from gaphor.core.modeling.event import (
     ElementCreated,
     ElementDeleted,
@@ -11,7 +12,8 @@ from gaphor.core.modeling.event import (
     ServiceEvent,
 )
 from gaphor.core.modeling.presentation import Presentation
-from gaphor.UML import Operation, Parameter
+from gaphor.UML import Dependency, Operation, Parameter, Usage
+from gaphor.UML.recipes import swap_element
 
 
 def test_element_factory_is_an_iterable(element_factory):
@@ -176,3 +178,83 @@ def test_indirect_delete_of_element(event_manager, element_factory):
     with pytest.raises(TypeError):
         assert operation.model
     assert operation not in element_factory
+
+
+def test_select_by_type(element_factory):
+    p1 = element_factory.create(Parameter)
+    o = element_factory.create(Operation)
+    p2 = element_factory.create(Parameter)
+
+    assert list(element_factory.select(Parameter)) == [p1, p2]
+    assert list(element_factory.select(Operation)) == [o]
+
+    p1.unlink()
+
+    assert list(element_factory.select(Parameter)) == [p2]
+
+
+def test_select_by_base_type_keeps_creation_order(element_factory):
+    p1 = element_factory.create(Parameter)
+    o = element_factory.create(Operation)
+    p2 = element_factory.create(Parameter)
+
+    assert list(element_factory.select(Element)) == [p1, o, p2]
+
+
+def test_select_by_type_without_elements(element_factory):
+    element_factory.create(Parameter)
+
+    assert list(element_factory.select(Operation)) == []
+
+
+def test_select_after_swapping_element_type(element_factory):
+    dependency = element_factory.create(Dependency)
+
+    swap_element(dependency, Usage)
+
+    assert list(element_factory.select(Usage)) == [dependency]
+    assert list(element_factory.select(Dependency)) == [dependency]
+
+
+def test_select_after_swapping_element_type_back(element_factory):
+    dependency = element_factory.create(Dependency)
+    usage = element_factory.create(Usage)
+
+    swap_element(dependency, Usage)
+
+    assert list(element_factory.select(Usage)) == [dependency, usage]
+    assert list(element_factory.select(Dependency)) == [dependency, usage]
+
+    swap_element(usage, Dependency)
+
+    assert list(element_factory.select(Usage)) == [dependency]
+    assert list(element_factory.select(Dependency)) == [dependency, usage]
+
+    swap_element(dependency, Dependency)
+
+    assert list(element_factory.select(Usage)) == []
+    assert list(element_factory.select(Dependency)) == [dependency, usage]
+
+
+def test_unlink_after_swapping_element_type(element_factory):
+    dependency = element_factory.create(Dependency)
+    swap_element(dependency, Usage)
+    clear_events()
+
+    dependency.unlink()
+
+    assert isinstance(last_event, ElementDeleted)
+    assert last_event.element is dependency
+    assert list(element_factory.select(Usage)) == []
+    assert list(element_factory.select(Dependency)) == []
+
+
+def test_unlink_after_changing_class_without_reindex(element_factory):
+    dependency = element_factory.create(Dependency)
+    dependency.__class__ = Usage
+    clear_events()
+
+    dependency.unlink()
+
+    assert isinstance(last_event, ElementDeleted)
+    assert list(element_factory.select(Dependency)) == []
@@ -15,6 +15,7 @@ from gaphor.diagram.connectors import (
     ItemConnected,
     ItemDisconnected,
     ItemReconnected,
+    RelationshipConnect,
 )
 from gaphor.diagram.presentation import ElementPresentation, LinePresentation
 
@@ -47,6 +48,8 @@ class PresentationConnector(ItemConnector):
 
         adapter = Connector(sink.item, item)
         if cinfo:
+            if isinstance(adapter, RelationshipConnect):
+                adapter.copy_subject()
             self.disconnect()
 
         self.glue(sink)
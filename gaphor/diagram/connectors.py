@@ -7,13 +7,13 @@ gaphor.adapter package.
 from __future__ import annotations
 
 import functools
-import itertools
+import inspect
 from typing import Iterator, Protocol, TypeVar
 
 from gaphas.connections import Connection
 from gaphas.connector import ConnectionSink, Handle, Port
 from gaphas.connector import Connector as ConnectorAspect
-from generic.multidispatch import FunctionDispatcher, multidispatch
+from generic.multidispatch import FunctionDispatcher
 
 from gaphor.core.modeling import Diagram, Element, Presentation
 from gaphor.core.modeling.event import RevertibleEvent
@@ -126,21 +126,64 @@ class NoConnector:
         pass
 
 
-# Work around issue https://github.com/python/mypy/issues/3135 (Class decorators are not type checked)
-# This definition, along with the ignore below, seems to fix the behaviour for mypy at least.
-Connector: FunctionDispatcher[type[ConnectorProtocol]] = multidispatch(object, object)(
-    NoConnector
-)
+class ConnectorDispatcher(FunctionDispatcher[type[ConnectorProtocol]]):
+    """Multidispatcher that remembers the connector resolved for a pair of
+    types, so lookups only walk the registry once.
+
+    The cache is cleared whenever a new connector is registered.
+    """
+
+    def __init__(self, argspec: inspect.FullArgSpec, params_arity: int) -> None:
+        super().__init__(argspec, params_arity)
+        self._resolved: dict[tuple[type, type], type[ConnectorProtocol]] = {}
+
+    def register_rule(self, rule, *argtypes) -> None:
+        super().register_rule(rule, *argtypes)
+        self._resolved.clear()
+
+    def __call__(self, element, line):
+        try:
+            connector = self._resolved[type(element), type(line)]
+        except KeyError:
+            connector = self.resolve(type(element), type(line))
+        return connector(element, line)
+
+    def resolve(self, element_type: type, line_type: type) -> type[ConnectorProtocol]:
+        """Get the connector class registered for an element and line type."""
+        key = (element_type, line_type)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        connector = self._resolved[key] = self._lookup(element_type, line_type)
+        return connector
+
+    def can_connect(self, element_type: type, line_type: type) -> bool:
+        return self.resolve(element_type, line_type) is not NoConnector
+
+    def _lookup(self, element_type: type, line_type: type) -> type[ConnectorProtocol]:
+        get_registration = self.registry.get_registration
+        line_mro = line_type.__mro__
+        for t1 in element_type.__mro__:
+            for t2 in line_mro:
+                if connector := get_registration(t1, t2):
+                    return connector
+        return NoConnector
+
+
+def connector_dispatcher() -> ConnectorDispatcher:
+    """Create a connector dispatcher, with :obj:`NoConnector` as fallback."""
+    dispatcher = ConnectorDispatcher(inspect.getfullargspec(NoConnector), 2)
+    dispatcher.register_rule(NoConnector, object, object)
+    return dispatcher
+
+
+Connector = connector_dispatcher()
 
 
-@functools.lru_cache()
 def can_connect(parent, element_type) -> bool:
-    parent_type = type(parent)
-    get_registration = Connector.registry.get_registration
-    for t1, t2 in itertools.product(parent_type.__mro__, element_type.__mro__):
-        if r := get_registration(t1, t2):
-            return r is not NoConnector
-    return False
+    return Connector.can_connect(type(parent), element_type)
 
 
 class RelationshipConnect(BaseConnector):
@@ -161,7 +204,26 @@ class RelationshipConnect(BaseConnector):
         self, element: Presentation[Element], line: Presentation[Element]
     ) -> None:
         super().__init__(element, line)
-        self.copy_buffer = dict(copy(line.subject)) if line.subject else {}
+        self._line_subject = line.subject
+
+    @functools.cached_property
+    def copy_buffer(self):
+        """A copy of the line's subject, as it was when this connector was
+        created.
+
+        The copy is made on first access. Use :meth:`copy_subject` to make
+        it before the subject is disconnected.
+        """
+        subject = self._line_subject
+        return dict(copy(subject)) if subject else {}
+
+    def copy_subject(self):
+        """Copy the line's subject now, and return the copy.
+
+        Reconnecting a line may unlink its subject, so this should be
+        called before the old connection is broken.
+        """
+        return self.copy_buffer
 
     def relationship(
         self, required_type: type[T], head: relation, tail: relation
@@ -178,21 +240,23 @@ class RelationshipConnect(BaseConnector):
         assert isinstance(tail, (association, redefine)), f"tail is {tail}"
 
         line = self.line
+        get_connection = self.diagram.connections.get_connection
+        head_get = head.get
 
-        line_head = self.get_connected(line.head)
-        line_tail = self.get_connected(line.tail)
-        assert line_head
-        assert line_tail
-        head_subject = line_head.subject
-        tail_subject = line_tail.subject
+        head_cinfo = get_connection(line.head)
+        tail_cinfo = get_connection(line.tail)
+        assert head_cinfo
+        assert tail_cinfo
+        head_subject = head_cinfo.connected.subject
+        tail_subject = tail_cinfo.connected.subject
 
         # First check if the right subject is already connected:
         if (
-            line.subject
-            and head.get(line.subject) is head_subject
-            and tail.get(line.subject) is tail_subject
+            (subject := line.subject)
+            and head_get(subject) is head_subject
+            and tail.get(subject) is tail_subject
         ):
-            return line.subject  # type: ignore[return-value]
+            return subject  # type: ignore[return-value]
 
         # Try to find a relationship, that is already created, but not
         # yet displayed in the diagram on the tail side, since tail should
@@ -200,12 +264,13 @@ class RelationshipConnect(BaseConnector):
         if not (head_subject and tail.opposite):
             return None
 
+        line_diagram = line.diagram
         gen: Element
         for gen in getattr(tail_subject, tail.opposite):
             if not isinstance(gen, required_type):
                 continue
 
-            gen_head = head.get(gen)
+            gen_head = head_get(gen)
             try:
                 if head_subject not in gen_head:
                     continue
@@ -218,7 +283,7 @@ class RelationshipConnect(BaseConnector):
             for item in gen.presentation:
                 # Allow line to be returned. Avoids strange
                 # behaviour during loading
-                if item.diagram is line.diagram and item is not line:
+                if item is not line and item.diagram is line_diagram:
                     break
             else:
                 return gen
@@ -260,35 +325,43 @@ class RelationshipConnect(BaseConnector):
         assert isinstance(relation, type)
         return relation
 
-    def connect_connected_items(self, connections: None = None) -> None:
+    def connect_connected_items(self) -> None:
         """Cause items connected to ``line`` to reconnect, allowing them to
         establish or destroy relationships at model level."""
         line = self.line
         diagram = self.diagram
 
         # First make sure coordinates match
-        diagram.connections.solver.solve()
-        for cinfo in connections or diagram.connections.get_connections(connected=line):
+        solver = diagram.connections.solver
+        if solver.needs_solving:
+            solver.solve()
+
+        for cinfo in diagram.connections.get_connections(connected=line):
             if line is cinfo.connected:
                 continue
-            adapter = Connector(line, cinfo.connected)
-            assert adapter, f"No element to connect {line} and {cinfo.connected}"
-            adapter.connect(cinfo.handle, cinfo.port)
+            connector = Connector.resolve(type(line), type(cinfo.connected))
+            if connector is NoConnector:
+                continue
+            connector(line, cinfo.connected).connect(cinfo.handle, cinfo.port)
 
     def disconnect_connected_items(self) -> list[Connection]:
         """Cause items connected to @line to be disconnected. This is necessary
         if the subject of the @line is to be removed.
 
-        Returns a list of (item, handle) pairs that were connected (this
-        list can be used to connect items again with
-        connect_connected_items()).
+        Returns a list of the connections that were disconnected.
         """
         line = self.line
         diagram = self.diagram
 
-        # First make sure coordinates match
-        diagram.connections.solver.solve()
+        # Take a snapshot: disconnecting can unlink a subject, which in turn
+        # removes its presentations' connections from this very table.
         connections = list(diagram.connections.get_connections(connected=line))
+
+        # First make sure coordinates match
+        solver = diagram.connections.solver
+        if connections and solver.needs_solving:
+            solver.solve()
+
         for cinfo in connections:
             adapter = Connector(cinfo.item, cinfo.connected)
             adapter.disconnect(cinfo.handle)
@@ -309,10 +382,10 @@ class RelationshipConnect(BaseConnector):
         """
         if not super().connect(handle, port):
             return False
-        opposite = self.line.opposite(handle)
-        if self.get_connected(opposite):
+        line = self.line
+        get_connection = self.diagram.connections.get_connection
+        if get_connection(line.opposite(handle)) is not None:
             self.connect_subject(handle)
-            line = self.line
             if line.subject:
                 self.connect_connected_items()
         return True
@@ -320,11 +393,12 @@ class RelationshipConnect(BaseConnector):
     def disconnect(self, handle: Handle) -> None:
         """Disconnect model element."""
         line = self.line
-        opposite = line.opposite(handle)
-        oct = self.get_connected(opposite)
-        hct = self.get_connected(handle)
+        get_connection = self.diagram.connections.get_connection
 
-        if hct and oct:
+        if (
+            get_connection(handle) is not None
+            and get_connection(line.opposite(handle)) is not None
+        ):
             # Both sides of line are connected => disconnect
             self.disconnect_connected_items()
             self.disconnect_subject(handle)
@@ -351,10 +425,9 @@ class DirectionalRelationshipConnect(RelationshipConnect):
 
         # Same goes for subjects:
         if (
-            connected_to
-            and not connected_to.subject
-            and not element.subject
-            and connected_to.subject is element.subject
+            connected_to is not None
+            and connected_to.subject is None
+            and element.subject is None
         ):
             return False
 
@@ -369,28 +442,23 @@ class MetadataRelationConnect(DirectionalRelationshipConnect):
         if not super().allow(handle, port):
             return False
 
-        element = self.element
-        opposite_element = self.get_connected(self.line.opposite(handle))
-        if metadata := get_diagram_item_metadata(type(self.line)):
-            return (
-                (
-                    isinstance(element.subject, metadata["head"].type)
-                    and (
-                        not opposite_element
-                        or isinstance(opposite_element.subject, metadata["tail"].type)
-                    )
-                )
-                if handle is self.line.head
-                else (
-                    isinstance(element.subject, metadata["tail"].type)
-                    and (
-                        not opposite_element
-                        or isinstance(opposite_element.subject, metadata["head"].type)
-                    )
-                )
-            )
+        line = self.line
+        if not (metadata := get_diagram_item_metadata(type(line))):
+            return False
 
-        return False
+        if handle is line.head:
+            end, opposite_end = metadata["head"], metadata["tail"]
+        else:
+            end, opposite_end = metadata["tail"], metadata["head"]
+
+        if not isinstance(self.element.subject, end.type):
+            return False
+
+        # Only look up the other end if this end is acceptable
+        opposite_element = self.get_connected(line.opposite(handle))
+        return not opposite_element or isinstance(
+            opposite_element.subject, opposite_end.type
+        )
 
     def connect_subject(self, handle):
         subject_type = get_model_element(type(self.line))
@@ -408,19 +476,18 @@ def paste_model(copy_data, diagram) -> Iterator[Element]:
     new_elements: dict[str, Element] = {}
 
     def create(ref: str):
-        if ref in new_elements:
-            return new_elements[ref]
+        if (element := new_elements.get(ref)) is not None:
+            return element
 
         if ref in copy_data:
             paster = paste(copy_data[ref], diagram, create)
-            new_elements[ref] = next(paster)
+            element = new_elements[ref] = next(paster)
             next(paster, None)
-            return new_elements[ref]
+            return element
 
     for old_id in copy_data:
-        if old_id in new_elements:
-            continue
-        create(old_id)
+        if old_id not in new_elements:
+            create(old_id)
 
     for element in new_elements.values():
         assert element
@@ -429,13 +496,25 @@ def paste_model(copy_data, diagram) -> Iterator[Element]:
     return iter(new_elements.values())
 
 
-class ItemConnected(RevertibleEvent):
+class ItemConnectionEvent(RevertibleEvent):
+    """Base for events that record a diagram level (dis)connection.
+
+    Handles and ports are stored by index, so the event can be reverted on
+    a recreated element.
+    """
+
+    __slots__ = ("handle_index", "connected_id", "port_index")
+
     def __init__(self, element, handle, connected, port):
         super().__init__(element)
         self.handle_index = element.handles().index(handle)
         self.connected_id = connected.id
         self.port_index = connected.ports().index(port)
 
+
+class ItemConnected(ItemConnectionEvent):
+    __slots__ = ()
+
     def revert(self, target):
         # Reverse only the diagram level connection.
         # Associations have their own handlers
@@ -446,12 +525,8 @@ class ItemConnected(RevertibleEvent):
         connector.disconnect_handle()
 
 
-class ItemDisconnected(RevertibleEvent):
-    def __init__(self, element, handle, connected, port):
-        super().__init__(element)
-        self.handle_index = element.handles().index(handle)
-        self.connected_id = connected.id
-        self.port_index = connected.ports().index(port)
+class ItemDisconnected(ItemConnectionEvent):
+    __slots__ = ()
 
     def revert(self, target):
         # Reverse only the diagram level connection.
@@ -466,12 +541,8 @@ class ItemDisconnected(RevertibleEvent):
         connector.connect_handle(sink)
 
 
-class ItemTemporaryDisconnected(RevertibleEvent):
-    def __init__(self, element, handle, connected, port):
-        super().__init__(element)
-        self.handle_index = element.handles().index(handle)
-        self.connected_id = connected.id
-        self.port_index = connected.ports().index(port)
+class ItemTemporaryDisconnected(ItemConnectionEvent):
+    __slots__ = ()
 
     def revert(self, target):
         handle = target.handles()[self.handle_index]
@@ -484,12 +555,8 @@ class ItemTemporaryDisconnected(RevertibleEvent):
         connector.reconnect_handle(sink)
 
 
-class ItemReconnected(RevertibleEvent):
-    def __init__(self, element, handle, connected, port):
-        super().__init__(element)
-        self.handle_index = element.handles().index(handle)
-        self.connected_id = connected.id
-        self.port_index = connected.ports().index(port)
+class ItemReconnected(ItemConnectionEvent):
+    __slots__ = ()
 
     def revert(self, target):
         connections = target.diagram.connections
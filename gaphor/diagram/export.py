@@ -14,7 +14,12 @@ def escape_filename(diagram_name):
     return re.sub("\\W+", "_", diagram_name)
 
 
-def render(diagram, new_surface, padding=8, write_to_png=None) -> None:
+def render(diagram, *new_surfaces, padding=8, write_to_png=None) -> None:
+    """Render a diagram to one or more surfaces.
+
+    The diagram is updated and measured once, then painted on each
+    surface created by ``new_surfaces``.
+    """
     diagram.update(diagram.ownedPresentation)
 
     painter = new_painter(diagram)
@@ -29,23 +34,25 @@ def render(diagram, new_surface, padding=8, write_to_png=None) -> None:
         bounding_box.height + 2 * padding + type_padding,
     )
 
-    with new_surface(w, h) as surface:
-        cr = cairo.Context(surface)
+    bg_color = diagram.style(StyledDiagram(diagram)).get("background-color")
+
+    for new_surface in new_surfaces:
+        with new_surface(w, h) as surface:
+            cr = cairo.Context(surface)
 
-        bg_color = diagram.style(StyledDiagram(diagram)).get("background-color")
-        if bg_color and bg_color[3]:
-            cr.rectangle(0, 0, w, h)
-            cr.set_source_rgba(*bg_color)
-            cr.fill()
+            if bg_color and bg_color[3]:
+                cr.rectangle(0, 0, w, h)
+                cr.set_source_rgba(*bg_color)
+                cr.fill()
 
-        cr.translate(
-            -bounding_box.x + padding, -bounding_box.y + padding + type_padding
-        )
-        painter.paint(diagram.get_all_items(), cr)
-        cr.show_page()
+            cr.translate(
+                -bounding_box.x + padding, -bounding_box.y + padding + type_padding
+            )
+            painter.paint(diagram.get_all_items(), cr)
+            cr.show_page()
 
-        if write_to_png:
-            surface.write_to_png(write_to_png)
+            if write_to_png:
+                surface.write_to_png(write_to_png)
 
 
 def diagram_type_height(diagram):
@@ -80,6 +87,14 @@ def save_pdf(filename, diagram):
     render(diagram, lambda w, h: cairo.PDFSurface(filename, w, h))
 
 
+def save_svg_and_pdf(svg_filename, pdf_filename, diagram):
+    render(
+        diagram,
+        lambda w, h: cairo.SVGSurface(svg_filename, w, h),
+        lambda w, h: cairo.PDFSurface(pdf_filename, w, h),
+    )
+
+
 def save_eps(filename, diagram):
     def new_surface(w, h):
         surface = cairo.PSSurface(filename, w, h)
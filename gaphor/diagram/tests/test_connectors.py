@@ -0,0 +1,44 @@
+from gaphor.diagram.connectors import (
+    Connector,
+    NoConnector,
+    can_connect,
+    connector_dispatcher,
+)
+
+
+class Parent:
+    pass
+
+
+class Child:
+    pass
+
+
+class SubChild(Child):
+    pass
+
+
+class ParentChildConnector(NoConnector):
+    pass
+
+
+def test_connector_cache_is_invalidated_on_register():
+    connector = connector_dispatcher()
+    parent, child = Parent(), SubChild()
+
+    assert type(connector(parent, child)) is NoConnector
+    assert not connector.can_connect(Parent, SubChild)
+
+    connector.register(Parent, Child)(ParentChildConnector)
+
+    assert type(connector(parent, child)) is ParentChildConnector
+    assert connector.can_connect(Parent, SubChild)
+
+
+def test_dispatchers_do_not_share_cache():
+    connector = connector_dispatcher()
+    connector.register(Parent, Child)(ParentChildConnector)
+
+    assert connector.can_connect(Parent, SubChild)
+    assert not Connector.can_connect(Parent, SubChild)
+    assert not can_connect(Parent(), SubChild)
@@ -6,6 +6,7 @@ from gaphor.diagram.export import (
     save_pdf,
     save_png,
     save_svg,
+    save_svg_and_pdf,
 )
 from gaphor.diagram.general import Box
 
@@ -43,6 +44,16 @@ def test_export_to_pdf(diagram_with_box, tmp_path):
     assert b"%PDF" in content
 
 
+def test_export_to_svg_and_pdf(diagram_with_box, tmp_path):
+    svg = tmp_path / "test.svg"
+    pdf = tmp_path / "test.pdf"
+
+    save_svg_and_pdf(svg, pdf, diagram_with_box)
+
+    assert "<svg" in svg.read_text(encoding="utf-8")
+    assert b"%PDF" in pdf.read_bytes()
+
+
 def test_export_to_eps(diagram_with_box, tmp_path):
     f = tmp_path / "test.eps"
 
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-import functools
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
 import sphinx.util.docutils
 from docutils import nodes
@@ -9,8 +12,9 @@ from docutils.parsers.rst import directives
 from docutils.parsers.rst.directives import images
 from sphinx.util import logging
 
+from gaphor.application import distribution
 from gaphor.core.modeling import Diagram, ElementFactory
-from gaphor.diagram.export import save_pdf, save_svg
+from gaphor.diagram.export import save_svg_and_pdf
 from gaphor.i18n import gettext
 from gaphor.services.modelinglanguage import ModelingLanguageService
 from gaphor.storage import storage
@@ -25,6 +29,9 @@ def setup(app: sphinx.application.Sphinx) -> dict[str, object]:
     app.add_directive("diagram", DiagramDirective)
 
     app.connect("config-inited", config_inited)
+    # Diagrams should be rendered before Sphinx collects the images of a document
+    app.connect("doctree-read", wait_for_rendered_diagrams, priority=400)
+    app.connect("build-finished", shutdown_render_pool)
 
     return {
         "version": "0.1",
@@ -39,6 +46,92 @@ def config_inited(app, config):
         config.gaphor_models = {"default": config.gaphor_models}
 
 
+class PendingRender(NamedTuple):
+    future: Future
+    name: str
+    docname: str
+
+
+_render_pool: ProcessPoolExecutor | None = None
+_pending_renders: dict[Path, PendingRender] = {}
+
+
+def render_diagram(model_file, diagram_id, svg_file, pdf_file) -> None:
+    """Render a diagram to SVG and PDF.
+
+    Both files are written to a temporary file first and moved in place
+    once rendering succeeded, so a failed render leaves no partial files.
+    """
+    diagram = load_model(model_file).element_factory.lookup(diagram_id)
+    svg_tmp = svg_file.with_name(f"{svg_file.name}.{os.getpid()}.tmp")
+    pdf_tmp = pdf_file.with_name(f"{pdf_file.name}.{os.getpid()}.tmp")
+    try:
+        save_svg_and_pdf(os.fspath(svg_tmp), os.fspath(pdf_tmp), diagram)
+        os.replace(svg_tmp, svg_file)
+        os.replace(pdf_tmp, pdf_file)
+    finally:
+        svg_tmp.unlink(missing_ok=True)
+        pdf_tmp.unlink(missing_ok=True)
+
+
+def submit_render_diagram(
+    model_file, diagram_id, svg_file, pdf_file, name, docname
+) -> None:
+    """Render a diagram in a worker process.
+
+    When Sphinx reads documents in parallel, this code already runs in a
+    worker process. In that case the diagram is rendered in-process.
+
+    A diagram that is already being rendered is not submitted again.
+    """
+    global _render_pool
+
+    if multiprocessing.parent_process():
+        try:
+            render_diagram(model_file, diagram_id, svg_file, pdf_file)
+        except Exception as e:
+            log_render_error(e, name, docname)
+        return
+
+    if svg_file in _pending_renders:
+        return
+
+    if not _render_pool:
+        _render_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+    _pending_renders[svg_file] = PendingRender(
+        _render_pool.submit(render_diagram, model_file, diagram_id, svg_file, pdf_file),
+        name,
+        docname,
+    )
+
+
+def wait_for_rendered_diagrams(app, doctree):
+    while _pending_renders:
+        _, pending = _pending_renders.popitem()
+        try:
+            pending.future.result()
+        except Exception as e:
+            log_render_error(e, pending.name, pending.docname)
+
+
+def log_render_error(error: Exception, name: str, docname: str) -> None:
+    log.error(
+        gettext("Could not render diagram '{name}': {error}").format(
+            name=name, error=error
+        ),
+        location=docname,
+    )
+
+
+def shutdown_render_pool(app, exception):
+    global _render_pool
+
+    if _render_pool:
+        _render_pool.shutdown()
+        _render_pool = None
+
+
 class DiagramDirective(sphinx.util.docutils.SphinxDirective):
     """The Gaphor diagram directive.
 
@@ -66,22 +159,19 @@ class DiagramDirective(sphinx.util.docutils.SphinxDirective):
             )
 
         self.env.note_dependency(model_file)
-        model = load_model(Path(self.env.srcdir) / model_file)
+        model_path = Path(self.env.srcdir) / model_file
+        model = load_model(model_path)
 
-        outdir = (Path(self.env.app.doctreedir) / ".." / "gaphor").resolve()
-        outdir.mkdir(exist_ok=True)
+        # Images are kept per Gaphor version, so an upgrade renders them again
+        outdir = (
+            Path(self.env.app.doctreedir) / ".." / "gaphor" / distribution().version
+        ).resolve()
+        outdir.mkdir(parents=True, exist_ok=True)
 
-        diagram = next(
-            model.select(
-                lambda e: isinstance(e, Diagram) and ".".join(e.qualifiedName) == name
-            ),
-            None,
-        )
+        diagram = model.diagrams_by_qualified_name.get(name)
 
         if not diagram:
-            diagram = next(
-                model.select(lambda e: isinstance(e, Diagram) and e.name == name), None
-            )
+            diagram = model.diagrams_by_name.get(name)
 
         if not diagram:
             return self.logging_error_node(
@@ -91,8 +181,14 @@ class DiagramDirective(sphinx.util.docutils.SphinxDirective):
             )
 
         outfile = outdir / f"{diagram.id}"
-        save_svg(outfile.with_suffix(".svg"), diagram)
-        save_pdf(outfile.with_suffix(".pdf"), diagram)
+        svg_file = outfile.with_suffix(".svg")
+        pdf_file = outfile.with_suffix(".pdf")
+        if not (
+            is_up_to_date(svg_file, model_path) and is_up_to_date(pdf_file, model_path)
+        ):
+            submit_render_diagram(
+                model_path, diagram.id, svg_file, pdf_file, name, self.env.docname
+            )
 
         # Image needs a relative path. Make our outfile path relative to the doc
         outdir = outdir.relative_to(self.env.srcdir)
@@ -112,8 +208,31 @@ class DiagramDirective(sphinx.util.docutils.SphinxDirective):
         return [nodes.error("", nodes.paragraph(text=text))]
 
 
-@functools.cache
-def load_model(model_file: str) -> ElementFactory:
+def is_up_to_date(target: Path, source: Path) -> bool:
+    """Check if ``target`` exists and is newer than ``source``."""
+    return target.exists() and target.stat().st_mtime > source.stat().st_mtime
+
+
+class Model(NamedTuple):
+    element_factory: ElementFactory
+    diagrams_by_qualified_name: dict[str, Diagram]
+    diagrams_by_name: dict[str, Diagram]
+
+
+_model_cache: dict[str, tuple[float, Model]] = {}
+
+
+def load_model(model_file) -> Model:
+    """Load a model file.
+
+    The loaded model is cached until the file is modified.
+    """
+    model_file = os.fspath(model_file)
+    mtime = os.stat(model_file).st_mtime
+    cached = _model_cache.get(model_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
     element_factory = ElementFactory()
 
     modeling_language = ModelingLanguageService()
@@ -124,4 +243,16 @@ def load_model(model_file: str) -> ElementFactory:
             element_factory,
             modeling_language,
         )
-    return element_factory
+
+    diagrams_by_qualified_name: dict[str, Diagram] = {}
+    diagrams_by_name: dict[str, Diagram] = {}
+    for diagram in element_factory.select(Diagram):
+        diagrams_by_qualified_name.setdefault(".".join(diagram.qualifiedName), diagram)
+        diagrams_by_name.setdefault(diagram.name, diagram)
+
+    model = Model(element_factory, diagrams_by_qualified_name, diagrams_by_name)
+    _model_cache[model_file] = (mtime, model)
+    return model
+
+
+load_model.cache_clear = _model_cache.clear  # type: ignore[attr-defined]
@@ -1,9 +1,96 @@
+# ruff: noqa: SLF001
+
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import Future
+
+import pytest
 import sphinx.application
 import sphinx.util.docutils
 
+import gaphor.extensions.sphinx
+from gaphor.application import distribution
+from gaphor.core.modeling import Diagram
+from gaphor.extensions.sphinx import (
+    PendingRender,
+    is_up_to_date,
+    load_model,
+    render_diagram,
+    submit_render_diagram,
+    wait_for_rendered_diagrams,
+)
 from gaphor.extensions.sphinx import setup as sphinx_setup
 
 
+@pytest.fixture
+def srcdir(tmp_path):
+    srcdir = tmp_path / "docs"
+    srcdir.mkdir()
+    shutil.copy("docs/style-sheet-examples.gaphor", srcdir / "model.gaphor")
+    (srcdir / "conf.py").write_text(
+        "extensions = ['gaphor.extensions.sphinx']\n"
+        "gaphor_models = {'default': 'model.gaphor'}\n"
+        "exclude_patterns = ['_build']\n",
+        encoding="utf-8",
+    )
+    (srcdir / "index.rst").write_text(
+        "Diagram\n=======\n\n.. diagram:: class\n", encoding="utf-8"
+    )
+    return srcdir
+
+
+def make_app(srcdir):
+    return sphinx.application.Sphinx(
+        srcdir=srcdir,
+        confdir=srcdir,
+        outdir=srcdir / "_build" / "html",
+        doctreedir=srcdir / "_build" / "doctrees",
+        buildername="html",
+        freshenv=True,
+        status=None,
+    )
+
+
+def build(srcdir):
+    app = make_app(srcdir)
+    app.build()
+    return app
+
+
+def rendered_files(srcdir):
+    diagram = load_model(srcdir / "model.gaphor").diagrams_by_name["class"]
+    outdir = srcdir / "_build" / "gaphor" / distribution().version
+    return outdir / f"{diagram.id}.svg", outdir / f"{diagram.id}.pdf"
+
+
+def done_future(exception=None):
+    future: Future = Future()
+    if exception:
+        future.set_exception(exception)
+    else:
+        future.set_result(None)
+    return future
+
+
+class FakeRenderPool:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        return done_future()
+
+
+@pytest.fixture
+def render_pool(monkeypatch):
+    render_pool = FakeRenderPool()
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: None)
+    monkeypatch.setattr(gaphor.extensions.sphinx, "_render_pool", render_pool)
+    monkeypatch.setattr(gaphor.extensions.sphinx, "_pending_renders", {})
+    return render_pool
+
+
 def test_setup(tmp_path):
     (tmp_path / "conf.py").write_text("", encoding="utf-8")
     gen = sphinx.application.Sphinx(
@@ -44,3 +131,213 @@ def test_setup_load_models(tmp_path):
     assert result["parallel_write_safe"]
 
     assert sphinx.util.docutils.is_directive_registered("diagram")
+
+
+def test_load_model_indexes_diagrams():
+    model = load_model("docs/style-sheet-examples.gaphor")
+
+    for diagram in model.element_factory.select(Diagram):
+        assert model.diagrams_by_name[diagram.name]
+        assert (
+            model.diagrams_by_qualified_name[".".join(diagram.qualifiedName)] is diagram
+        )
+
+
+def test_load_model_is_cached_until_file_changes(tmp_path):
+    model_file = tmp_path / "model.gaphor"
+    shutil.copy("docs/style-sheet-examples.gaphor", model_file)
+
+    model = load_model(model_file)
+
+    assert load_model(model_file) is model
+
+    stat = model_file.stat()
+    os.utime(model_file, (stat.st_atime, stat.st_mtime + 1))
+
+    assert load_model(model_file) is not model
+
+
+def test_load_model_cache_clear(tmp_path):
+    model_file = tmp_path / "model.gaphor"
+    shutil.copy("docs/style-sheet-examples.gaphor", model_file)
+
+    model = load_model(model_file)
+    load_model.cache_clear()
+
+    assert load_model(model_file) is not model
+
+
+def test_is_up_to_date(tmp_path):
+    source = tmp_path / "model.gaphor"
+    target = tmp_path / "diagram.svg"
+    source.write_text("", encoding="utf-8")
+
+    assert not is_up_to_date(target, source)
+
+    target.write_text("", encoding="utf-8")
+    os.utime(source, (0, 0))
+
+    assert is_up_to_date(target, source)
+
+    os.utime(target, (0, 0))
+    os.utime(source, (1, 1))
+
+    assert not is_up_to_date(target, source)
+
+
+def test_render_diagram(srcdir):
+    model_file = srcdir / "model.gaphor"
+    diagram = load_model(model_file).diagrams_by_name["class"]
+    svg_file = srcdir / "diagram.svg"
+    pdf_file = srcdir / "diagram.pdf"
+
+    render_diagram(model_file, diagram.id, svg_file, pdf_file)
+
+    assert svg_file.exists()
+    assert pdf_file.exists()
+    assert sorted(p.name for p in srcdir.glob("diagram.*")) == [
+        "diagram.pdf",
+        "diagram.svg",
+    ]
+
+
+def test_failed_render_leaves_no_files(srcdir, monkeypatch):
+    def failing_save_svg_and_pdf(svg_filename, pdf_filename, diagram):
+        with open(svg_filename, "w", encoding="utf-8") as svg:
+            svg.write("<svg")
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(
+        gaphor.extensions.sphinx, "save_svg_and_pdf", failing_save_svg_and_pdf
+    )
+    model_file = srcdir / "model.gaphor"
+    diagram = load_model(model_file).diagrams_by_name["class"]
+
+    with pytest.raises(RuntimeError):
+        render_diagram(
+            model_file, diagram.id, srcdir / "diagram.svg", srcdir / "diagram.pdf"
+        )
+
+    assert not list(srcdir.glob("diagram.*"))
+
+
+def test_build_skips_up_to_date_diagrams(srcdir, monkeypatch):
+    build(srcdir)
+    svg_file, pdf_file = rendered_files(srcdir)
+    submitted = []
+    monkeypatch.setattr(
+        gaphor.extensions.sphinx,
+        "submit_render_diagram",
+        lambda *args: submitted.append(args),
+    )
+
+    build(srcdir)
+
+    assert svg_file.exists()
+    assert pdf_file.exists()
+    assert not submitted
+
+
+def test_build_renders_outdated_diagrams_again(srcdir, monkeypatch):
+    build(srcdir)
+    svg_file, pdf_file = rendered_files(srcdir)
+    os.utime(svg_file, (0, 0))
+    os.utime(pdf_file, (0, 0))
+    submitted = []
+    monkeypatch.setattr(
+        gaphor.extensions.sphinx,
+        "submit_render_diagram",
+        lambda *args: submitted.append(args),
+    )
+
+    build(srcdir)
+
+    assert [args[2:4] for args in submitted] == [(svg_file, pdf_file)]
+
+
+def test_diagrams_are_rendered_before_images_are_collected(srcdir):
+    rendered = []
+
+    def on_doctree_read(app, doctree):
+        rendered.extend(path.exists() for path in rendered_files(srcdir))
+
+    app = make_app(srcdir)
+    app.connect("doctree-read", on_doctree_read)
+    app.build()
+
+    assert rendered == [True, True]
+
+
+def test_build_shuts_down_render_pool(srcdir):
+    build(srcdir)
+
+    assert gaphor.extensions.sphinx._render_pool is None
+    assert not gaphor.extensions.sphinx._pending_renders
+
+
+def test_submit_creates_render_pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: None)
+    monkeypatch.setattr(gaphor.extensions.sphinx, "_render_pool", None)
+    monkeypatch.setattr(gaphor.extensions.sphinx, "_pending_renders", {})
+    model_file = tmp_path / "model.gaphor"
+    shutil.copy("docs/style-sheet-examples.gaphor", model_file)
+    diagram = load_model(model_file).diagrams_by_name["class"]
+    svg_file = tmp_path / "diagram.svg"
+
+    submit_render_diagram(
+        model_file, diagram.id, svg_file, tmp_path / "diagram.pdf", "class", "index"
+    )
+    render_pool = gaphor.extensions.sphinx._render_pool
+    wait_for_rendered_diagrams(None, None)
+    render_pool.shutdown()
+
+    assert render_pool
+    assert svg_file.exists()
+
+
+def test_submit_skips_pending_diagram(render_pool, tmp_path):
+    svg_file = tmp_path / "diagram.svg"
+    pdf_file = tmp_path / "diagram.pdf"
+
+    submit_render_diagram("model.gaphor", "1", svg_file, pdf_file, "a", "index")
+    submit_render_diagram("model.gaphor", "1", svg_file, pdf_file, "a", "other")
+
+    assert render_pool.submitted == [("model.gaphor", "1", svg_file, pdf_file)]
+    assert list(gaphor.extensions.sphinx._pending_renders) == [svg_file]
+
+
+def test_submit_renders_in_process_in_worker(monkeypatch, tmp_path):
+    rendered = []
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: object())
+    monkeypatch.setattr(gaphor.extensions.sphinx, "_render_pool", None)
+    monkeypatch.setattr(
+        gaphor.extensions.sphinx, "render_diagram", lambda *args: rendered.append(args)
+    )
+    svg_file = tmp_path / "diagram.svg"
+    pdf_file = tmp_path / "diagram.pdf"
+
+    submit_render_diagram("model.gaphor", "1", svg_file, pdf_file, "a", "index")
+
+    assert rendered == [("model.gaphor", "1", svg_file, pdf_file)]
+    assert gaphor.extensions.sphinx._render_pool is None
+    assert not gaphor.extensions.sphinx._pending_renders
+
+
+def test_wait_reports_failed_renders(render_pool, monkeypatch):
+    errors = []
+    monkeypatch.setattr(
+        gaphor.extensions.sphinx.log,
+        "error",
+        lambda msg, location: errors.append((msg, location)),
+    )
+    gaphor.extensions.sphinx._pending_renders.update(
+        {
+            "a.svg": PendingRender(done_future(RuntimeError("boom")), "a", "doc-a"),
+            "b.svg": PendingRender(done_future(), "b", "doc-b"),
+        }
+    )
+
+    wait_for_rendered_diagrams(None, None)
+
+    assert errors == [("Could not render diagram 'a': boom", "doc-a")]
+    assert not gaphor.extensions.sphinx._pending_renders